@@ -9,22 +9,27 @@ from pathlib import Path
 from typing import Any
 
 from flask import Flask
+from flask_compress import Compress
 from flask_cors import CORS
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
 
-# Ensure local imports resolve when running `python app.py`.
+# Ensure `api.*` imports resolve when running `python app.py`. Only the project
+# root is added: putting this directory itself on sys.path would also make
+# `models`, `routes.*` etc. importable under a second name, loading duplicate
+# module copies (and a second declarative Base).
 BASE_DIR = Path(__file__).resolve().parent
-if str(BASE_DIR) not in sys.path:
-    sys.path.insert(0, str(BASE_DIR))
+PROJECT_ROOT = BASE_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from api.models import Base  # noqa: E402
 from api.routes.alerts import alerts_bp  # noqa: E402
 from api.routes.forecast import forecast_bp  # noqa: E402
 from api.routes.metrics import metrics_bp  # noqa: E402
 from api.routes.system import system_bp  # noqa: E402
 from api.services.config import configure_logging, load_config  # noqa: E402
+from api.services.database import create_session_factory  # noqa: E402
+from api.services.resources import KnownResources  # noqa: E402
 from api.services.scheduler import SchedulerService  # noqa: E402
+from api.services.serialization import ORJSONProvider  # noqa: E402
 
 
 def create_app() -> Flask:
@@ -33,24 +38,33 @@ def create_app() -> Flask:
     config = load_config()
 
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     app.config["APP_CONFIG"] = config
+    # Time-series JSON compresses well; level 4 keeps gzip cheap on large ranges.
+    app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+    app.config["COMPRESS_LEVEL"] = 4
+    app.config["COMPRESS_MIN_SIZE"] = 512
+    # Flask-Compress would otherwise buffer a streamed body whole to compress it.
+    app.config["COMPRESS_STREAMS"] = False
+    Compress(app)
 
     CORS(
         app,
         resources={r"/api/*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]}},
     )
 
-    engine = create_engine(
-        f"sqlite:///{config.database_path}",
-        connect_args={"check_same_thread": False},
-        future=True,
-    )
-    Base.metadata.create_all(engine)
-
-    session_factory = scoped_session(sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
-
+    session_factory = create_session_factory(config)
     app.session_factory = session_factory  # type: ignore[attr-defined]
 
+    # A standalone scheduler cannot notify this process of new resources, so
+    # re-read them once per poll interval in that mode.
+    known_resources = KnownResources(
+        session_factory,
+        max_age=None if config.embedded_scheduler else config.poll_interval_minutes * 60,
+    )
+    session_factory.remove()
+    app.known_resources = known_resources  # type: ignore[attr-defined]
+
     @app.teardown_appcontext
     def remove_session(_: Any) -> None:
         session_factory.remove()
@@ -61,21 +75,28 @@ def create_app() -> Flask:
     app.register_blueprint(forecast_bp)
     app.register_blueprint(alerts_bp)
 
-    scheduler = SchedulerService(session_factory=session_factory, config=config)
+    app.scheduler_service = None  # type: ignore[attr-defined]
+    if config.embedded_scheduler:
+        scheduler = SchedulerService(
+            session_factory=session_factory, config=config, known_resources=known_resources
+        )
 
-    def start_scheduler_if_main_process() -> None:
-        # Avoid double-start when Flask reloader spawns child processes.
-        if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
-            return
-        scheduler.start()
+        def start_scheduler_if_main_process() -> None:
+            # Avoid double-start when Flask reloader spawns child processes.
+            if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+                return
+            scheduler.start()
 
-    start_scheduler_if_main_process()
-    atexit.register(scheduler.shutdown)
+        start_scheduler_if_main_process()
+        atexit.register(scheduler.shutdown)
+        app.scheduler_service = scheduler  # type: ignore[attr-defined]
 
-    app.scheduler_service = scheduler  # type: ignore[attr-defined]
     return app
 
 
 if __name__ == "__main__":
+    # The development server runs collection in-process; production deployments
+    # run `python -m api.run_scheduler` alongside gunicorn instead.
+    os.environ.setdefault("AUTOSCALE_EMBEDDED_SCHEDULER", "1")
     application = create_app()
     application.run(host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
@@ -3,17 +3,31 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from api.collectors.base import MetricCollector, MetricSample, CollectorError
+from api.collectors.base import MetricBatch, MetricCollector, MetricSample, CollectorError, map_concurrently
 
 try:
     import boto3  # type: ignore
+    from botocore.config import Config as BotoConfig  # type: ignore
     from botocore.exceptions import BotoCoreError, ClientError  # type: ignore
 except Exception:  # pragma: no cover - boto3 optional in local mode
     boto3 = None
+    BotoConfig = None
     BotoCoreError = ClientError = Exception  # type: ignore
 
+PERIOD_SECONDS = 300
+# GetMetricData accepts at most 500 queries per request.
+MAX_QUERIES_PER_REQUEST = 500
+
+# (metric key, namespace, CloudWatch metric name, statistic, unit)
+METRIC_DEFINITIONS = (
+    ("cpu_pct", "AWS/EC2", "CPUUtilization", "Average", "Percent"),
+    ("mem_pct", "CWAgent", "mem_used_percent", "Average", None),
+    ("net_in", "AWS/EC2", "NetworkIn", "Sum", None),
+    ("net_out", "AWS/EC2", "NetworkOut", "Sum", None),
+)
+
 
 class AWSCloudWatchCollector(MetricCollector):
     """Fetches EC2 metrics from CloudWatch."""
@@ -28,53 +42,46 @@ class AWSCloudWatchCollector(MetricCollector):
 
         self.region = region
         self.resource_ids = list(resource_ids)
-        self.client = boto3.client("cloudwatch", region_name=region)
-
-    def fetch(self) -> Sequence[MetricSample]:
+        self.client = boto3.client(
+            "cloudwatch",
+            region_name=region,
+            config=BotoConfig(max_pool_connections=32, retries={"mode": "adaptive"}),
+        )
+
+        # Queries depend only on the fixed resource list; StartTime/EndTime are
+        # top-level request parameters, so the pages can be reused every poll.
+        queries, self._query_index = self._build_queries()
+        self._query_batches = [
+            queries[offset : offset + MAX_QUERIES_PER_REQUEST]
+            for offset in range(0, len(queries), MAX_QUERIES_PER_REQUEST)
+        ]
+
+    def fetch(self) -> MetricBatch:
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(minutes=10)
-        samples: List[MetricSample] = []
-
-        for resource_id in self.resource_ids:
-            cpu, ts_cpu = self._fetch_stat(
-                namespace="AWS/EC2",
-                metric_name="CPUUtilization",
-                statistic="Average",
-                dimension_name="InstanceId",
-                resource_id=resource_id,
-                start_time=start_time,
-                end_time=end_time,
-            )
-
-            mem, _ = self._fetch_stat(
-                namespace="CWAgent",
-                metric_name="mem_used_percent",
-                statistic="Average",
-                dimension_name="InstanceId",
-                resource_id=resource_id,
-                start_time=start_time,
-                end_time=end_time,
-            )
 
-            net_in_bytes, ts_in = self._fetch_stat(
-                namespace="AWS/EC2",
-                metric_name="NetworkIn",
-                statistic="Sum",
-                dimension_name="InstanceId",
-                resource_id=resource_id,
-                start_time=start_time,
-                end_time=end_time,
-            )
+        responses = map_concurrently(
+            lambda batch: self._get_metric_data(batch, start_time, end_time), self._query_batches
+        )
+
+        latest: Dict[Tuple[str, str], Tuple[float, datetime]] = {}
+        for results in responses:
+            for result in results:
+                key = self._query_index[result["Id"]]
+                values = result.get("Values") or []
+                timestamps = result.get("Timestamps") or []
+                # Results are scanned newest-first, so the first datapoint seen for a
+                # query is the latest one; continuation pages only carry older points.
+                if key in latest or not values or not timestamps:
+                    continue
+                latest[key] = (values[0], timestamps[0])
 
-            net_out_bytes, ts_out = self._fetch_stat(
-                namespace="AWS/EC2",
-                metric_name="NetworkOut",
-                statistic="Sum",
-                dimension_name="InstanceId",
-                resource_id=resource_id,
-                start_time=start_time,
-                end_time=end_time,
-            )
+        samples: List[MetricSample] = []
+        for resource_id in self.resource_ids:
+            cpu, ts_cpu = latest.get((resource_id, "cpu_pct"), (None, None))
+            mem, _ = latest.get((resource_id, "mem_pct"), (None, None))
+            net_in_bytes, ts_in = latest.get((resource_id, "net_in"), (None, None))
+            net_out_bytes, ts_out = latest.get((resource_id, "net_out"), (None, None))
 
             # Determine timestamp preference: fallback order CPU -> net_in -> net_out -> now
             ts = ts_cpu or ts_in or ts_out or end_time
@@ -84,9 +91,8 @@ class AWSCloudWatchCollector(MetricCollector):
                 continue
 
             # CloudWatch network metrics are bytes over the period (default 5 minutes).
-            period_seconds = 300
-            net_in_kbps = self._bytes_to_kilobits_per_sec(net_in_bytes, period_seconds)
-            net_out_kbps = self._bytes_to_kilobits_per_sec(net_out_bytes, period_seconds)
+            net_in_kbps = self._bytes_to_kilobits_per_sec(net_in_bytes, PERIOD_SECONDS)
+            net_out_kbps = self._bytes_to_kilobits_per_sec(net_out_bytes, PERIOD_SECONDS)
 
             samples.append(
                 MetricSample(
@@ -100,43 +106,58 @@ class AWSCloudWatchCollector(MetricCollector):
                 )
             )
 
-        return samples
+        return MetricBatch.from_samples(self.provider, samples)
 
-    def _fetch_stat(
+    def _build_queries(self) -> Tuple[List[dict], Dict[str, Tuple[str, str]]]:
+        """Build one GetMetricData query per (resource, metric) pair.
+
+        Returns the queries along with a mapping of query ``Id`` back to the
+        ``(resource_id, metric_key)`` pair it was issued for.
+        """
+        queries: List[dict] = []
+        query_index: Dict[str, Tuple[str, str]] = {}
+        for resource_id in self.resource_ids:
+            for metric_key, namespace, metric_name, statistic, unit in METRIC_DEFINITIONS:
+                query_id = f"m{len(queries)}"
+                metric_stat = {
+                    "Metric": {
+                        "Namespace": namespace,
+                        "MetricName": metric_name,
+                        "Dimensions": [{"Name": "InstanceId", "Value": resource_id}],
+                    },
+                    "Period": PERIOD_SECONDS,
+                    "Stat": statistic,
+                }
+                if unit:
+                    metric_stat["Unit"] = unit
+                queries.append({"Id": query_id, "MetricStat": metric_stat, "ReturnData": True})
+                query_index[query_id] = (resource_id, metric_key)
+        return queries, query_index
+
+    def _get_metric_data(
         self,
-        namespace: str,
-        metric_name: str,
-        statistic: str,
-        dimension_name: str,
-        resource_id: str,
+        queries: List[dict],
         start_time: datetime,
         end_time: datetime,
-    ) -> Tuple[Optional[float], Optional[datetime]]:
+    ) -> List[dict]:
         params = {
-            "Namespace": namespace,
-            "MetricName": metric_name,
-            "Dimensions": [{"Name": dimension_name, "Value": resource_id}],
+            "MetricDataQueries": queries,
             "StartTime": start_time,
             "EndTime": end_time,
-            "Period": 300,
-            "Statistics": [statistic],
+            "ScanBy": "TimestampDescending",
         }
-        if metric_name.endswith("Utilization"):
-            params["Unit"] = "Percent"
-
-        try:
-            response = self.client.get_metric_statistics(**params)
-        except (BotoCoreError, ClientError) as exc:  # pragma: no cover - remote call
-            raise CollectorError(f"Failed to fetch {metric_name} for {resource_id}: {exc}") from exc
-
-        datapoints = sorted(response.get("Datapoints", []), key=lambda d: d.get("Timestamp", start_time))
-        if not datapoints:
-            return None, None
-
-        datapoint = datapoints[-1]
-        value = datapoint.get(statistic)
-        ts = datapoint.get("Timestamp")
-        return value, ts
+        results: List[dict] = []
+        while True:
+            try:
+                response = self.client.get_metric_data(**params)
+            except (BotoCoreError, ClientError) as exc:  # pragma: no cover - remote call
+                raise CollectorError(f"Failed to fetch CloudWatch metric data: {exc}") from exc
+
+            results.extend(response.get("MetricDataResults", []))
+            next_token = response.get("NextToken")
+            if not next_token:
+                return results
+            params["NextToken"] = next_token
 
     @staticmethod
     def _bytes_to_kilobits_per_sec(value: Optional[float], period_seconds: int) -> float:
@@ -3,9 +3,18 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Sequence
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Sequence, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Shared by all collectors so worker threads survive across scheduler cycles.
+_FETCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="autoscale-collector")
 
 
 @dataclass
@@ -21,6 +30,67 @@ class MetricSample:
     net_out_kbps: float
 
 
+@dataclass
+class MetricBatch:
+    """Column-oriented samples from one collector run, one array entry per resource.
+
+    Timestamps are stored as naive UTC ``datetime64[us]`` to match how they are
+    persisted in SQLite.
+    """
+
+    provider: str
+    resource_ids: List[str]
+    timestamps: np.ndarray
+    cpu_pct: np.ndarray
+    mem_pct: np.ndarray
+    net_in_kbps: np.ndarray
+    net_out_kbps: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.resource_ids)
+
+    @classmethod
+    def from_samples(cls, provider: str, samples: Sequence[MetricSample]) -> "MetricBatch":
+        count = len(samples)
+        return cls(
+            provider=provider,
+            resource_ids=[sample.resource_id for sample in samples],
+            timestamps=np.array([_naive_utc(sample.timestamp) for sample in samples], dtype="datetime64[us]"),
+            cpu_pct=np.fromiter((sample.cpu_pct for sample in samples), dtype=np.float64, count=count),
+            mem_pct=np.fromiter((sample.mem_pct for sample in samples), dtype=np.float64, count=count),
+            net_in_kbps=np.fromiter((sample.net_in_kbps for sample in samples), dtype=np.float64, count=count),
+            net_out_kbps=np.fromiter((sample.net_out_kbps for sample in samples), dtype=np.float64, count=count),
+        )
+
+    def rows(self) -> List[Dict]:
+        """Build insert parameters for ``MetricRecord``, converting each column in one pass."""
+        return [
+            {
+                "provider": self.provider,
+                "resource_id": resource_id,
+                "timestamp": timestamp,
+                "cpu_pct": cpu_pct,
+                "mem_pct": mem_pct,
+                "net_in_kbps": net_in_kbps,
+                "net_out_kbps": net_out_kbps,
+            }
+            for resource_id, timestamp, cpu_pct, mem_pct, net_in_kbps, net_out_kbps in zip(
+                self.resource_ids,
+                self.timestamps.tolist(),
+                self.cpu_pct.tolist(),
+                self.mem_pct.tolist(),
+                self.net_in_kbps.tolist(),
+                self.net_out_kbps.tolist(),
+            )
+        ]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class CollectorError(RuntimeError):
     """Raised when a collector fails irrecoverably."""
 
@@ -31,6 +101,12 @@ class MetricCollector(ABC):
     provider: str = "unknown"
 
     @abstractmethod
-    def fetch(self) -> Sequence[MetricSample]:
-        """Retrieve metric samples from the upstream provider."""
+    def fetch(self) -> MetricBatch:
+        """Retrieve the latest metrics for every resource from the upstream provider."""
+
 
+def map_concurrently(func: Callable[[T], R], items: Sequence[T]) -> List[R]:
+    """Apply ``func`` to ``items`` on the shared I/O pool, preserving input order."""
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    return list(_FETCH_POOL.map(func, items))
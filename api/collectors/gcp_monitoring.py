@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Sequence
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
 
-from api.collectors.base import MetricCollector, MetricSample, CollectorError
+from api.collectors.base import MetricBatch, MetricCollector, MetricSample, CollectorError, map_concurrently
 
 try:
     from google.cloud import monitoring_v3  # type: ignore
@@ -14,6 +14,27 @@ except Exception:  # pragma: no cover - optional dependency
     monitoring_v3 = None
     GoogleAPICallError = Exception  # type: ignore
 
+QUERY_WINDOW = timedelta(minutes=10)
+KBPS_PER_BYTE_PER_SECOND = 8.0 / 1024.0
+
+# (metric key, metric type, per-series aligner, scale to collector units)
+# The alignment period equals QUERY_WINDOW, so every aligner yields exactly one
+# point: the window mean for CPU, the most recent sample for memory, and the
+# per-second rate for the byte counters.
+METRIC_DEFINITIONS = (
+    ("cpu_pct", "compute.googleapis.com/instance/cpu/utilization", "ALIGN_MEAN", 100.0),
+    ("mem_pct", "agent.googleapis.com/memory/percent_used", "ALIGN_NEXT_OLDER", 1.0),
+    ("net_in", "compute.googleapis.com/instance/network/received_bytes_count", "ALIGN_RATE", KBPS_PER_BYTE_PER_SECOND),
+    ("net_out", "compute.googleapis.com/instance/network/sent_bytes_count", "ALIGN_RATE", KBPS_PER_BYTE_PER_SECOND),
+)
+
+
+class _MetricQuery(NamedTuple):
+    metric_type: str
+    filter: str
+    aggregation: object
+    scale: float
+
 
 class GCPMonitoringCollector(MetricCollector):
     """Fetches metrics from Google Cloud Monitoring."""
@@ -33,62 +54,67 @@ class GCPMonitoringCollector(MetricCollector):
         self.client = monitoring_v3.MetricServiceClient()
         self.project_name = f"projects/{project_id}"
 
-    def fetch(self) -> Sequence[MetricSample]:
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(minutes=10)
-        samples: List[MetricSample] = []
-
-        for instance_id in self.instance_ids:
-            cpu = self._fetch_latest_value(
-                metric_type="compute.googleapis.com/instance/cpu/utilization",
-                instance_id=instance_id,
-                start_time=start_time,
-                end_time=end_time,
-                scale=100.0,
+        # Filters and aggregations never change, so build them once rather than per poll.
+        aggregations = {
+            aligner: monitoring_v3.Aggregation(
+                {
+                    "per_series_aligner": getattr(monitoring_v3.Aggregation.Aligner, aligner),
+                    "alignment_period": {"seconds": int(QUERY_WINDOW.total_seconds())},
+                }
             )
-
-            mem = self._fetch_latest_value(
-                metric_type="agent.googleapis.com/memory/percent_used",
-                instance_id=instance_id,
-                start_time=start_time,
-                end_time=end_time,
-                scale=1.0,
+            for aligner in {definition[2] for definition in METRIC_DEFINITIONS}
+        }
+        self._queries: Dict[str, Tuple[_MetricQuery, ...]] = {
+            instance_id: tuple(
+                _MetricQuery(
+                    metric_type=metric_type,
+                    filter=(
+                        f'metric.type="{metric_type}" AND '
+                        f'resource.type="gce_instance" AND '
+                        f'resource.labels.instance_id="{instance_id}"'
+                    ),
+                    aggregation=aggregations[aligner],
+                    scale=scale,
+                )
+                for _, metric_type, aligner, scale in METRIC_DEFINITIONS
             )
+            for instance_id in self.instance_ids
+        }
 
-            net_in = self._fetch_latest_value(
-                metric_type="compute.googleapis.com/instance/network/received_bytes_count",
-                instance_id=instance_id,
-                start_time=start_time,
-                end_time=end_time,
-                scale=8.0 / 1024.0 / 60.0,
-            )
+    def fetch(self) -> MetricBatch:
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - QUERY_WINDOW
+        interval = monitoring_v3.TimeInterval(
+            {"end_time": {"seconds": int(end_time.timestamp())}, "start_time": {"seconds": int(start_time.timestamp())}}
+        )
 
-            net_out = self._fetch_latest_value(
-                metric_type="compute.googleapis.com/instance/network/sent_bytes_count",
-                instance_id=instance_id,
-                start_time=start_time,
-                end_time=end_time,
-                scale=8.0 / 1024.0 / 60.0,
-            )
+        # The Monitoring client is thread-safe, so instances are queried concurrently.
+        results = map_concurrently(
+            lambda instance_id: self._fetch_one_resource(instance_id, interval, end_time),
+            self.instance_ids,
+        )
+        return MetricBatch.from_samples(self.provider, [sample for sample in results if sample is not None])
 
-            timestamp = cpu.timestamp if cpu.value is not None else end_time
+    def _fetch_one_resource(self, instance_id: str, interval, end_time: datetime) -> Optional[MetricSample]:
+        cpu, mem, net_in, net_out = (
+            self._fetch_latest_value(query, instance_id, interval, end_time)
+            for query in self._queries[instance_id]
+        )
 
-            if all(v.value is None for v in (cpu, mem, net_in, net_out)):
-                continue
+        timestamp = cpu.timestamp if cpu.value is not None else end_time
 
-            samples.append(
-                MetricSample(
-                    provider=self.provider,
-                    resource_id=instance_id,
-                    timestamp=timestamp,
-                    cpu_pct=cpu.value or 0.0,
-                    mem_pct=mem.value or 0.0,
-                    net_in_kbps=net_in.value or 0.0,
-                    net_out_kbps=net_out.value or 0.0,
-                )
-            )
+        if all(v.value is None for v in (cpu, mem, net_in, net_out)):
+            return None
 
-        return samples
+        return MetricSample(
+            provider=self.provider,
+            resource_id=instance_id,
+            timestamp=timestamp,
+            cpu_pct=cpu.value or 0.0,
+            mem_pct=mem.value or 0.0,
+            net_in_kbps=net_in.value or 0.0,
+            net_out_kbps=net_out.value or 0.0,
+        )
 
     class _ValueWithTimestamp:
         def __init__(self, value: Optional[float], timestamp: datetime):
@@ -97,52 +123,39 @@ class GCPMonitoringCollector(MetricCollector):
 
     def _fetch_latest_value(
         self,
-        metric_type: str,
+        query: _MetricQuery,
         instance_id: str,
-        start_time: datetime,
+        interval,
         end_time: datetime,
-        scale: float,
     ) -> "GCPMonitoringCollector._ValueWithTimestamp":
-        interval = monitoring_v3.TimeInterval(
-            {"end_time": {"seconds": int(end_time.timestamp())}, "start_time": {"seconds": int(start_time.timestamp())}}
-        )
-        alignment = monitoring_v3.Aggregation(
-            {
-                "per_series_aligner": monitoring_v3.Aggregation.Aligner.ALIGN_MEAN,
-                "alignment_period": {"seconds": 60},
-            }
-        )
-        filter_str = (
-            f'metric.type="{metric_type}" AND '
-            f'resource.type="gce_instance" AND '
-            f'resource.labels.instance_id="{instance_id}"'
-        )
+        """Return the latest value of a metric, scaled to the collector's units.
 
+        The alignment period spans the whole query window, so the API reduces the
+        series server-side and returns a single aligned point. Byte counters use
+        ALIGN_RATE and therefore arrive as bytes per second.
+        """
         request = monitoring_v3.ListTimeSeriesRequest(
             name=self.project_name,
-            filter=filter_str,
+            filter=query.filter,
             interval=interval,
-            aggregation=alignment,
+            aggregation=query.aggregation,
             view=monitoring_v3.ListTimeSeriesRequest.TimeSeriesView.FULL,
         )
 
         try:
             series = list(self.client.list_time_series(request=request))
         except GoogleAPICallError as exc:  # pragma: no cover - remote call
-            raise CollectorError(f"Failed to fetch {metric_type} for {instance_id}: {exc}") from exc
-
-        if not series:
-            return self._ValueWithTimestamp(None, end_time)
+            raise CollectorError(f"Failed to fetch {query.metric_type} for {instance_id}: {exc}") from exc
 
-        points = sorted(series[0].points, key=lambda p: p.interval.end_time.seconds)
-        if not points:
+        if not series or not series[0].points:
             return self._ValueWithTimestamp(None, end_time)
 
-        latest = points[-1]
+        # One alignment period per window means a single aligned point per series.
+        latest = series[0].points[0]
         ts_seconds = latest.interval.end_time.seconds
         ts_nanos = latest.interval.end_time.nanos
         ts = datetime.fromtimestamp(ts_seconds + ts_nanos / 1e9, tz=timezone.utc)
         value = latest.value.double_value if latest.value else None
         if value is not None:
-            value *= scale
+            value *= query.scale
         return self._ValueWithTimestamp(value, ts)
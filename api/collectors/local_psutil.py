@@ -2,12 +2,12 @@
 
 from __future__ import annotations
 
-import math
-import random
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Sequence
+from typing import Optional, Sequence
 
-from api.collectors.base import MetricCollector, MetricSample, CollectorError
+import numpy as np
+
+from api.collectors.base import MetricBatch, MetricCollector, CollectorError
 
 try:
     import psutil  # type: ignore
@@ -24,10 +24,11 @@ class LocalPsutilCollector(MetricCollector):
         if not psutil:
             raise CollectorError("psutil is not installed; cannot use local metrics provider.")
         self.resource_ids = list(resource_ids or ["local-node"])
+        self._offsets = np.arange(len(self.resource_ids), dtype=np.float64)
         self._last_net_total = psutil.net_io_counters()
         self._last_timestamp = datetime.now(timezone.utc)
 
-    def fetch(self) -> Sequence[MetricSample]:
+    def fetch(self) -> MetricBatch:
         now = datetime.now(timezone.utc)
         time_delta = (now - self._last_timestamp).total_seconds() or 1.0
 
@@ -45,20 +46,21 @@ class LocalPsutilCollector(MetricCollector):
         self._last_net_total = net
         self._last_timestamp = now
 
-        samples: List[MetricSample] = []
-        for idx, resource_id in enumerate(self.resource_ids):
-            # Introduce slight variation for additional simulated resources.
-            variation = math.sin(now.timestamp() / 60.0 + idx) * 5.0
-            jitter = random.uniform(-2.0, 2.0)
-            samples.append(
-                MetricSample(
-                    provider=self.provider,
-                    resource_id=resource_id,
-                    timestamp=now,
-                    cpu_pct=max(0.0, min(100.0, cpu_pct + variation + jitter)),
-                    mem_pct=max(0.0, min(100.0, mem_pct + jitter)),
-                    net_in_kbps=max(0.0, net_in_kbps + random.uniform(-10.0, 10.0)),
-                    net_out_kbps=max(0.0, net_out_kbps + random.uniform(-10.0, 10.0)),
-                )
-            )
-        return samples
+        # Introduce slight variation for additional simulated resources.
+        count = len(self.resource_ids)
+        variation = np.sin(now.timestamp() / 60.0 + self._offsets) * 5.0
+        jitter = np.random.uniform(-2.0, 2.0, size=count)
+        cpu = np.clip(cpu_pct + variation + jitter, 0.0, 100.0)
+        mem = np.clip(mem_pct + jitter, 0.0, 100.0)
+        net_in = np.maximum(0.0, net_in_kbps + np.random.uniform(-10.0, 10.0, size=count))
+        net_out = np.maximum(0.0, net_out_kbps + np.random.uniform(-10.0, 10.0, size=count))
+
+        return MetricBatch(
+            provider=self.provider,
+            resource_ids=list(self.resource_ids),
+            timestamps=np.full(count, np.datetime64(now.replace(tzinfo=None), "us")),
+            cpu_pct=cpu,
+            mem_pct=mem,
+            net_in_kbps=net_in,
+            net_out_kbps=net_out,
+        )
@@ -3,39 +3,49 @@
 from __future__ import annotations
 
 from flask import Blueprint, current_app, jsonify, request
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 
 from api.models import AlertRecord
 from api.services import alerts as alert_service
+from api.services.cache import bump_version, cached
 
 alerts_bp = Blueprint("alerts", __name__, url_prefix="/api")
 
 
 @alerts_bp.get("/alerts")
+@cached(ttl=10, args=("limit",))
 def list_alerts():
     """Return recent alerts."""
-    session = current_app.session_factory()
-    try:
-        limit = min(int(request.args.get("limit", "50")), 200)
-        records = (
-            session.query(AlertRecord)
-            .order_by(desc(AlertRecord.created_at))
-            .limit(limit)
-            .all()
+    # The scoped_session registry proxies to this thread's session; the app's
+    # teardown handler removes it once the request is done.
+    session = current_app.session_factory
+    # Malformed values fall back to the default instead of raising.
+    limit = max(1, min(request.args.get("limit", default=50, type=int), 200))
+    stmt = (
+        select(
+            AlertRecord.id,
+            AlertRecord.created_at,
+            AlertRecord.resource_id,
+            AlertRecord.metric,
+            AlertRecord.channel,
+            AlertRecord.status,
+            AlertRecord.message,
         )
-        payload = [record.to_dict() for record in records]
-        return jsonify({"alerts": payload})
-    finally:
-        session.close()
+        .order_by(desc(AlertRecord.created_at))
+        .limit(limit)
+    )
+    payload = [dict(row) for row in session.execute(stmt).mappings()]
+    return jsonify({"alerts": payload})
 
 
 @alerts_bp.post("/test-alert")
 def trigger_test_alert():
     """Send a test alert across configured channels."""
-    session = current_app.session_factory()
+    session = current_app.session_factory
     config = current_app.config.get("APP_CONFIG")
     try:
         records, message, channels = alert_service.send_test_alert(session, config)
+        bump_version()
         return jsonify(
             {
                 "status": "success",
@@ -47,5 +57,3 @@ def trigger_test_alert():
         session.rollback()
         current_app.logger.exception("Unexpected failure sending test alert: %s", exc)
         return jsonify({"status": "success", "message": "Test alert failed; see logs for details.", "channels": []})
-    finally:
-        session.close()
@@ -3,38 +3,32 @@
 from __future__ import annotations
 
 from flask import Blueprint, current_app, jsonify, request
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, select
 
 from api.models import ForecastRecord
+from api.services.cache import cached
 
 forecast_bp = Blueprint("forecast", __name__, url_prefix="/api")
 
 
 @forecast_bp.get("/forecast")
+@cached(ttl=10, args=("resource_id",))
 def list_forecasts():
     """Return the latest forecast data per resource."""
-    session = current_app.session_factory()
-    try:
-        resource_id = request.args.get("resource_id")
-
-        query = session.query(ForecastRecord)
-        if resource_id:
-            query = query.filter(ForecastRecord.resource_id == resource_id)
-
-        records = query.order_by(asc(ForecastRecord.resource_id), desc(ForecastRecord.created_at)).all()
-        payload = [
-            {
-                "resource_id": record.resource_id,
-                "metric": record.metric,
-                "predicted_breach_time": record.predicted_breach_time.isoformat()
-                if record.predicted_breach_time
-                else None,
-                "confidence": record.confidence,
-                "created_at": record.created_at.isoformat(),
-            }
-            for record in records
-        ]
-
-        return jsonify({"forecasts": payload})
-    finally:
-        session.close()
+    session = current_app.session_factory
+    resource_id = request.args.get("resource_id")
+
+    stmt = select(
+        ForecastRecord.resource_id,
+        ForecastRecord.metric,
+        ForecastRecord.predicted_breach_time,
+        ForecastRecord.confidence,
+        ForecastRecord.created_at,
+    )
+    if resource_id:
+        stmt = stmt.where(ForecastRecord.resource_id == resource_id)
+
+    stmt = stmt.order_by(asc(ForecastRecord.resource_id), desc(ForecastRecord.created_at))
+    payload = [dict(row) for row in session.execute(stmt).mappings()]
+
+    return jsonify({"forecasts": payload})
@@ -3,69 +3,93 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Dict, List
 
 from flask import Blueprint, current_app, jsonify, request
-from sqlalchemy import asc
+from sqlalchemy import Integer, cast, desc, func, select
 
 from api.models import MetricRecord
+from api.services.cache import cached
 
 metrics_bp = Blueprint("metrics", __name__, url_prefix="/api")
 
 RANGE_TO_HOURS = {"1h": 1, "6h": 6, "24h": 24}
+# Charts cannot show more points than this, so wider ranges are averaged into
+# buckets server-side; buckets never get shorter than a minute.
+MAX_POINTS = 300
+MIN_BUCKET_SECONDS = 60
 
 
 @metrics_bp.get("/metrics")
+@cached(ttl=10, args=("range", "resource_id"))
 def list_metrics():
-    """Return time-series metrics for a resource and time range."""
-    session = current_app.session_factory()
-    try:
-        range_spec = request.args.get("range", "6h")
-        range_hours = RANGE_TO_HOURS.get(range_spec, 6)
-        resource_id = request.args.get("resource_id")
-
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=range_hours)
-
-        query = session.query(MetricRecord).filter(MetricRecord.timestamp >= start_time)
-        if resource_id:
-            query = query.filter(MetricRecord.resource_id == resource_id)
-        else:
-            # Default to the first configured resource if not specified.
-            default_resource = (current_app.config.get("APP_CONFIG").resource_ids or ["local-node"])[0]
-            resource_id = default_resource
-            query = query.filter(MetricRecord.resource_id == resource_id)
-
-        records = query.order_by(asc(MetricRecord.timestamp)).all()
-
-        available_resources = [
-            row[0] for row in session.query(MetricRecord.resource_id).distinct().order_by(MetricRecord.resource_id).all()
-        ]
-        if not available_resources:
-            available_resources = current_app.config.get("APP_CONFIG").resource_ids
-
-        data: List[Dict] = []
-        for record in records:
-            data.append(
-                {
-                    "timestamp": record.timestamp.isoformat(),
-                    "cpu_pct": record.cpu_pct,
-                    "mem_pct": record.mem_pct,
-                    "net_in_kbps": record.net_in_kbps,
-                    "net_out_kbps": record.net_out_kbps,
-                }
-            )
-
-        latest_point = data[-1] if data else None
-
-        return jsonify(
-            {
-                "resource_id": resource_id,
-                "range": range_spec,
-                "available_resources": available_resources,
-                "metrics": data,
-                "latest": latest_point,
-            }
+    """Return time-series metrics for a resource and time range.
+
+    Samples are averaged into fixed-width time buckets so roughly ``MAX_POINTS``
+    points are returned; each point is a bucket average stamped with the time of
+    the bucket's earliest sample. ``latest`` is the newest raw sample, not a bucket.
+    """
+    session = current_app.session_factory
+    range_spec = request.args.get("range", "6h")
+    range_hours = RANGE_TO_HOURS.get(range_spec, 6)
+    resource_id = request.args.get("resource_id")
+
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(hours=range_hours)
+
+    if not resource_id:
+        # Default to the first configured resource if not specified.
+        resource_id = (current_app.config.get("APP_CONFIG").resource_ids or ["local-node"])[0]
+
+    bucket_seconds = max(MIN_BUCKET_SECONDS, range_hours * 3600 // MAX_POINTS)
+    bucket = cast(func.strftime("%s", MetricRecord.timestamp), Integer) // bucket_seconds
+    stmt = (
+        select(
+            func.min(MetricRecord.timestamp),
+            func.avg(MetricRecord.cpu_pct),
+            func.avg(MetricRecord.mem_pct),
+            func.avg(MetricRecord.net_in_kbps),
+            func.avg(MetricRecord.net_out_kbps),
+        )
+        .where(MetricRecord.resource_id == resource_id, MetricRecord.timestamp >= start_time)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    metrics = [_point(*row) for row in session.execute(stmt)]
+
+    # Served by one entry of the (resource_id, timestamp) unique index.
+    latest = session.execute(
+        select(
+            MetricRecord.timestamp,
+            MetricRecord.cpu_pct,
+            MetricRecord.mem_pct,
+            MetricRecord.net_in_kbps,
+            MetricRecord.net_out_kbps,
         )
-    finally:
-        session.close()
+        .where(MetricRecord.resource_id == resource_id, MetricRecord.timestamp >= start_time)
+        .order_by(desc(MetricRecord.timestamp))
+        .limit(1)
+    ).first()
+
+    available_resources = current_app.known_resources.sorted()
+    if not available_resources:
+        available_resources = current_app.config.get("APP_CONFIG").resource_ids
+
+    return jsonify(
+        {
+            "resource_id": resource_id,
+            "range": range_spec,
+            "available_resources": available_resources,
+            "metrics": metrics,
+            "latest": _point(*latest) if latest else None,
+        }
+    )
+
+
+def _point(timestamp, cpu_pct, mem_pct, net_in_kbps, net_out_kbps) -> dict:
+    return {
+        "timestamp": timestamp,
+        "cpu_pct": cpu_pct,
+        "mem_pct": mem_pct,
+        "net_in_kbps": net_in_kbps,
+        "net_out_kbps": net_out_kbps,
+    }
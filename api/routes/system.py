@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from flask import Blueprint, current_app, jsonify
 
-from api.services.alerts import available_alert_channels
+from api.services.cache import cached
 
 system_bp = Blueprint("system", __name__, url_prefix="/api")
 
@@ -15,8 +15,6 @@ def health_check():
 
 
 @system_bp.get("/config")
+@cached(ttl=60)
 def read_config():
-    config = current_app.config.get("APP_CONFIG")
-    payload = config.as_read_only_dict()
-    payload["available_alert_channels"] = available_alert_channels(config)
-    return jsonify(payload)
+    return jsonify(current_app.config.get("APP_CONFIG").as_read_only_dict())
@@ -0,0 +1,39 @@
+"""Standalone process running metric collection, forecasting, and alerting.
+
+Run exactly one instance next to the web workers::
+
+    python -m api.run_scheduler
+"""
+
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+
+from api.services.config import configure_logging, load_config
+from api.services.database import create_session_factory
+from api.services.scheduler import SchedulerService
+
+LOGGER = logging.getLogger("autoscale.scheduler")
+
+
+def main() -> None:
+    configure_logging()
+    config = load_config()
+    scheduler = SchedulerService(session_factory=create_session_factory(config), config=config)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    scheduler.start()
+    try:
+        stop.wait()
+    finally:
+        scheduler.shutdown()
+        LOGGER.info("Scheduler process exiting.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,94 +2,110 @@
 
 from __future__ import annotations
 
-import json
 import logging
-import os
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from email.message import EmailMessage
-from typing import Iterable, List, Tuple
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+from email.utils import getaddresses
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import desc
+import orjson
+import requests
+from sqlalchemy import desc, insert, select, tuple_, union_all
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from api.models import AlertRecord, ForecastRecord, MetricRecord
 from api.services.config import AppConfig
 
 LOGGER = logging.getLogger("autoscale.alerts")
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+# (connect, read) seconds for Slack webhook calls.
+SLACK_TIMEOUT = (3.05, 6.05)
 
+# Keeps the TLS connection to the webhook host warm across alerts.
+_SLACK_SESSION = requests.Session()
+_SLACK_HEADERS = {"Content-Type": "application/json"}
 
-def available_alert_channels(config: AppConfig) -> List[str]:
-    """Compute available alert channels at runtime."""
-    channels: List[str] = []
-    if SLACK_WEBHOOK_URL:
-        channels.append("slack")
-    if config.alerts.smtp_host and config.alerts.smtp_to:
-        channels.append("email")
-    return channels
+# Deliveries are network-bound, so they fan out instead of running back to back.
+_DELIVERY_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="autoscale-alerts")
 
+# Stays under SQLite's default limit of 500 terms in one compound SELECT.
+LATEST_METRICS_PER_QUERY = 400
 
-def dispatch_alerts(session: Session, forecasts: Iterable[ForecastRecord], config: AppConfig) -> None:
-    """Send alerts for forecasts that fall within the lookahead window."""
-    channels = available_alert_channels(config)
+
+def dispatch_alerts(
+    session: Session,
+    forecasts: Iterable[ForecastRecord],
+    config: AppConfig,
+    now: Optional[datetime] = None,
+) -> None:
+    """Send alerts for forecasts that fall within the lookahead window.
+
+    ``now`` defaults to the current UTC time; the scheduler passes its cycle time.
+    """
+    channels = config.alerts.channels
     if not channels:
         LOGGER.debug("No alert channels configured; skipping alert dispatch.")
         return
 
-    now = datetime.utcnow()
-    lookahead = timedelta(minutes=config.alert_lookahead_min)
+    now = now or datetime.utcnow()
+    lookahead = config.alert_lookahead
 
+    # At most one alert per (resource_id, metric) per cycle; the first forecast wins.
+    due: List[ForecastRecord] = []
+    seen: Set[Tuple[str, str]] = set()
     for forecast in forecasts:
-        if not forecast.predicted_breach_time:
-            continue
-        time_to_breach = forecast.predicted_breach_time - now
-        if time_to_breach > lookahead:
+        key = (forecast.resource_id, forecast.metric)
+        if key in seen or not forecast.predicted_breach_time or forecast.predicted_breach_time - now > lookahead:
             continue
+        seen.add(key)
+        due.append(forecast)
+    if not due:
+        return
+
+    latest_by_resource = _latest_metrics(session, {forecast.resource_id for forecast in due})
+    recent = _recently_alerted(session, seen, now - lookahead)
 
-        if _has_recent_alert(session, forecast, lookahead):
+    deliveries: List[Tuple[ForecastRecord, str, str]] = []
+    for forecast in due:
+        if (forecast.resource_id, forecast.metric) in recent:
             LOGGER.debug(
                 "Alert already sent recently for %s/%s; skipping.", forecast.resource_id, forecast.metric
             )
             continue
 
-        latest_metric = (
-            session.query(MetricRecord)
-            .filter(MetricRecord.resource_id == forecast.resource_id)
-            .order_by(desc(MetricRecord.timestamp))
-            .first()
-        )
-
+        latest_metric = latest_by_resource.get(forecast.resource_id)
         current_value = getattr(latest_metric, forecast.metric, None) if latest_metric else None
         message = (
             f"Resource {forecast.resource_id} is forecasted to breach {forecast.metric.upper()} "
             f"threshold at {forecast.predicted_breach_time.isoformat()} (current={current_value or 'n/a'})."
         )
 
-        for channel in channels:
-            status = "sent"
-            try:
-                _deliver_alert(channel, config, message)
-            except Exception as exc:  # pragma: no cover - network operations
-                status = "failed"
-                LOGGER.exception("Failed to deliver alert via %s: %s", channel, exc)
-            finally:
-                session.add(
-                    AlertRecord(
-                        resource_id=forecast.resource_id,
-                        metric=forecast.metric,
-                        channel=channel,
-                        status=status,
-                        message=message,
-                    )
-                )
+        deliveries.extend((forecast, channel, message) for channel in channels)
+
+    if not deliveries:
+        return
+
+    statuses = _deliver_all(config, [(channel, message) for _, channel, message in deliveries])
+    session.execute(
+        insert(AlertRecord),
+        [
+            {
+                "resource_id": forecast.resource_id,
+                "metric": forecast.metric,
+                "channel": channel,
+                "status": status,
+                "message": message,
+            }
+            for (forecast, channel, message), status in zip(deliveries, statuses)
+        ],
+    )
 
 
 def send_test_alert(session: Session, config: AppConfig) -> Tuple[List[AlertRecord], str, List[str]]:
     """Send a test alert through all configured channels."""
-    channels = available_alert_channels(config)
+    channels = config.alerts.channels
     forecast_stub = ForecastRecord(
         resource_id="test-resource",
         metric="cpu_pct",
@@ -116,25 +132,22 @@ def send_test_alert(session: Session, config: AppConfig) -> Tuple[List[AlertReco
         session.commit()
         return records, "Stored test alert (no delivery channels configured).", successful_channels
 
-    for channel in channels:
-        status = "sent"
-        try:
-            _deliver_alert(channel, config, message)
+    statuses = _deliver_all(config, [(channel, message) for channel in channels])
+    for channel, status in zip(channels, statuses):
+        if status == "sent":
             successful_channels.append(channel)
-        except Exception as exc:  # pragma: no cover
-            status = "failed"
-            LOGGER.exception("Failed to deliver test alert via %s: %s", channel, exc)
+        else:
             failed_channels.append(channel)
-        finally:
-            record = AlertRecord(
+        records.append(
+            AlertRecord(
                 resource_id=forecast_stub.resource_id,
                 metric=forecast_stub.metric,
                 channel=channel,
                 status=status,
                 message=message,
             )
-            session.add(record)
-            records.append(record)
+        )
+    session.add_all(records)
     session.commit()
     if successful_channels:
         success_message = f"Test alert sent via: {', '.join(successful_channels)}"
@@ -145,65 +158,148 @@ def send_test_alert(session: Session, config: AppConfig) -> Tuple[List[AlertReco
     return records, success_message, successful_channels
 
 
+def _deliver_all(config: AppConfig, deliveries: Sequence[Tuple[str, str]]) -> List[str]:
+    """Send each (channel, message) pair concurrently and return its status, in input order.
+
+    Emails share one SMTP session, so they are sent sequentially by a single worker
+    while the other channels fan out one delivery per task.
+    """
+    statuses = ["failed"] * len(deliveries)
+    email_indexes = [index for index, (channel, _) in enumerate(deliveries) if channel == "email"]
+    email_future = (
+        _DELIVERY_POOL.submit(_send_email_alerts, config, [deliveries[index][1] for index in email_indexes])
+        if email_indexes
+        else None
+    )
+    futures = {
+        index: _DELIVERY_POOL.submit(_deliver_alert, channel, config, message)
+        for index, (channel, message) in enumerate(deliveries)
+        if channel != "email"
+    }
+
+    for index, future in futures.items():
+        try:
+            future.result()
+            statuses[index] = "sent"
+        except Exception as exc:  # pragma: no cover - network operations
+            LOGGER.exception("Failed to deliver alert via %s: %s", deliveries[index][0], exc)
+
+    if email_future is not None:
+        try:
+            delivered = email_future.result()
+        except Exception as exc:  # pragma: no cover - network operations
+            LOGGER.exception("Failed to deliver alert via email: %s", exc)
+            delivered = [False] * len(email_indexes)
+        for index, ok in zip(email_indexes, delivered):
+            if ok:
+                statuses[index] = "sent"
+    return statuses
+
+
 def _deliver_alert(channel: str, config: AppConfig, message: str) -> None:
+    # Email never reaches here; _deliver_all batches it through _send_email_alerts.
     if channel == "slack":
-        send_to_slack(message)
-    elif channel == "email":
-        _send_email_alert(config, message)
+        _post_to_slack(config, orjson.dumps({"text": message}))
     else:
         raise ValueError(f"Unsupported alert channel: {channel}")
 
 
-def send_to_slack(message: str) -> None:
-    """Send a simple message to the configured Slack webhook."""
-    if not SLACK_WEBHOOK_URL:
+def _post_to_slack(config: AppConfig, payload: bytes) -> None:
+    """POST an already-serialized JSON payload to the Slack webhook."""
+    webhook_url = config.alerts.slack_webhook_url
+    if not webhook_url:
         raise ValueError("Slack webhook URL not configured.")
 
-    payload = json.dumps({"text": message}).encode("utf-8")
-    request = Request(
-        SLACK_WEBHOOK_URL,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     try:
-        with urlopen(request, timeout=10) as response:  # pragma: no cover - network call
-            if response.status >= 400:
-                raise ValueError(f"Slack webhook returned status {response.status}")
-        LOGGER.info("Slack alert sent successfully.")
-    except URLError as exc:  # pragma: no cover
+        response = _SLACK_SESSION.post(  # pragma: no cover - network call
+            webhook_url, data=payload, headers=_SLACK_HEADERS, timeout=SLACK_TIMEOUT
+        )
+    except requests.RequestException as exc:  # pragma: no cover
         LOGGER.error("Slack webhook error: %s", exc)
         raise ValueError(f"Slack webhook error: {exc}") from exc
+    if response.status_code >= 400:
+        raise ValueError(f"Slack webhook returned status {response.status_code}")
+    LOGGER.info("Slack alert sent successfully.")
 
 
-def _send_email_alert(config: AppConfig, message: str) -> None:
+def _send_email_alerts(config: AppConfig, messages: Sequence[str]) -> List[bool]:
+    """Send every message over one SMTP session, returning per-message success.
+
+    Connecting, STARTTLS and login happen once; failing any of them raises.
+    """
     if not config.alerts.smtp_host or not config.alerts.smtp_to or not config.alerts.smtp_from:
         raise ValueError("SMTP configuration incomplete.")
 
-    email = EmailMessage()
-    email["Subject"] = "AutoScale CIRM Alert"
-    email["From"] = config.alerts.smtp_from
-    email["To"] = config.alerts.smtp_to
-    email.set_content(message)
-
+    # Render every email to bytes before connecting so the session is only used for sending.
+    emails = [_render_email(config, message) for message in messages]
+    recipients = [address for _, address in getaddresses([config.alerts.smtp_to])]
     smtp_port = config.alerts.smtp_port or 587
+    delivered: List[bool] = []
 
     with smtplib.SMTP(config.alerts.smtp_host, smtp_port, timeout=10) as server:  # pragma: no cover - network call
         server.starttls()
         if config.alerts.smtp_user and config.alerts.smtp_pass:
             server.login(config.alerts.smtp_user, config.alerts.smtp_pass)
-        server.send_message(email)
+        for email in emails:
+            try:
+                server.sendmail(config.alerts.smtp_from, recipients, email)
+                delivered.append(True)
+            except smtplib.SMTPException as exc:
+                LOGGER.error("Failed to send email alert: %s", exc)
+                delivered.append(False)
+    return delivered
 
 
-def _has_recent_alert(session: Session, forecast: ForecastRecord, lookahead: timedelta) -> bool:
-    cutoff = datetime.utcnow() - lookahead
-    return (
-        session.query(AlertRecord)
-        .filter(
-            AlertRecord.resource_id == forecast.resource_id,
-            AlertRecord.metric == forecast.metric,
+def _render_email(config: AppConfig, message: str) -> bytes:
+    email = EmailMessage()
+    email["Subject"] = "AutoScale CIRM Alert"
+    email["From"] = config.alerts.smtp_from
+    email["To"] = config.alerts.smtp_to
+    email.set_content(message)
+    return email.as_bytes()
+
+
+def _latest_metrics(session: Session, resource_ids: Set[str]) -> Dict[str, Row]:
+    """Fetch the newest metric row for each resource.
+
+    Each resource gets its own ``ORDER BY timestamp DESC LIMIT 1`` lookup, which
+    reads one entry from the (resource_id, timestamp) index; the lookups are
+    combined with UNION ALL so a handful of queries cover every resource.
+    """
+    latest: Dict[str, Row] = {}
+    ordered_ids = sorted(resource_ids)
+    for start in range(0, len(ordered_ids), LATEST_METRICS_PER_QUERY):
+        lookups = [
+            select(
+                select(
+                    MetricRecord.resource_id,
+                    MetricRecord.cpu_pct,
+                    MetricRecord.mem_pct,
+                    MetricRecord.net_in_kbps,
+                    MetricRecord.net_out_kbps,
+                )
+                .where(MetricRecord.resource_id == resource_id)
+                .order_by(desc(MetricRecord.timestamp))
+                .limit(1)
+                .subquery()
+            )
+            for resource_id in ordered_ids[start : start + LATEST_METRICS_PER_QUERY]
+        ]
+        stmt = lookups[0] if len(lookups) == 1 else union_all(*lookups)
+        latest.update((row.resource_id, row) for row in session.execute(stmt))
+    return latest
+
+
+def _recently_alerted(
+    session: Session, pairs: Set[Tuple[str, str]], cutoff: datetime
+) -> Set[Tuple[str, str]]:
+    """Return the (resource_id, metric) pairs that already have an alert since ``cutoff``."""
+    rows = session.execute(
+        select(AlertRecord.resource_id, AlertRecord.metric)
+        .where(
             AlertRecord.created_at >= cutoff,
+            tuple_(AlertRecord.resource_id, AlertRecord.metric).in_(pairs),
         )
-        .first()
-        is not None
+        .distinct()
     )
+    return {(resource_id, metric) for resource_id, metric in rows}
@@ -0,0 +1,103 @@
+"""In-process TTL cache for serialized API responses.
+
+Entries live in each web worker's memory. ``bump_version()`` only clears the
+cache of the process that calls it, so writes made by the standalone scheduler
+(``python -m api.run_scheduler``) show up once the entry's TTL runs out. The TTL
+is the staleness bound in that deployment.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Sequence, Tuple
+
+from flask import current_app, request
+
+# Entries kept per process. Views only key on the query args they read, but
+# arbitrary values of those args can still produce distinct keys.
+MAX_ENTRIES = 256
+
+
+class TTLCache:
+    """Thread-safe LRU of response bodies with per-entry expiry."""
+
+    def __init__(self, maxsize: int = MAX_ENTRIES) -> None:
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, body)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._purge_expired(now)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def bump_version(self) -> None:
+        """Invalidate all entries; keys built before the bump can never hit again."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+
+response_cache = TTLCache()
+
+
+def bump_version() -> None:
+    """Invalidate this process's cached responses after the underlying data changed."""
+    response_cache.bump_version()
+
+
+def cached(ttl: float, args: Sequence[str] = ()) -> Callable:
+    """Cache a JSON view's response body for ``ttl`` seconds.
+
+    The key is the request path plus the values of ``args``, the query
+    parameters the view reads; any other query parameters are ignored.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*view_args, **view_kwargs):
+            values = "&".join(f"{name}={request.args.get(name, '')}" for name in args)
+            key = f"{response_cache.version}:{request.path}?{values}"
+            body = response_cache.get(key)
+            if body is not None:
+                return current_app.response_class(body, mimetype="application/json")
+
+            response = current_app.make_response(view(*view_args, **view_kwargs))
+            if response.status_code == 200:
+                response_cache.set(key, response.get_data(), ttl)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -5,18 +5,22 @@ from __future__ import annotations
 import logging
 import os
 from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from dotenv import load_dotenv
 
-# Load .env early so downstream modules see env vars.
-load_dotenv()
+# Load .env early so downstream modules see env vars. Deployments that inject
+# the environment directly can skip the filesystem lookup.
+if os.getenv("AUTOSCALE_SKIP_DOTENV") != "1":
+    load_dotenv()
 
 
-@dataclass
+@dataclass(frozen=True)
 class AlertSettings:
-    """Alert output configuration."""
+    """Alert output configuration; immutable once loaded."""
 
     slack_webhook_url: Optional[str] = None
     smtp_host: Optional[str] = None
@@ -26,13 +30,14 @@ class AlertSettings:
     smtp_from: Optional[str] = None
     smtp_to: Optional[str] = None
 
-    def channels(self) -> List[str]:
+    @cached_property
+    def channels(self) -> Tuple[str, ...]:
         channels: List[str] = []
         if self.slack_webhook_url:
             channels.append("slack")
         if self.smtp_host and self.smtp_to:
             channels.append("email")
-        return channels
+        return tuple(channels)
 
 
 @dataclass
@@ -45,6 +50,7 @@ class AppConfig:
     threshold_mem: float = 90.0
     alert_lookahead_min: int = 60
     max_forecast_horizon_min: int = 180
+    embedded_scheduler: bool = False
     resource_ids: List[str] = field(default_factory=lambda: ["local-node"])
     aws_region: Optional[str] = None
     gcp_project_id: Optional[str] = None
@@ -52,6 +58,13 @@ class AppConfig:
     database_path: Path = field(
         default_factory=lambda: Path(__file__).resolve().parents[1] / "autoscale.db"
     )
+    # Derived once in __post_init__ so the scheduler does not rebuild them every cycle.
+    alert_lookahead: timedelta = field(init=False, repr=False)
+    forecast_horizon: timedelta = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.alert_lookahead = timedelta(minutes=self.alert_lookahead_min)
+        self.forecast_horizon = timedelta(minutes=self.max_forecast_horizon_min)
 
     def as_read_only_dict(self) -> dict:
         return {
@@ -60,7 +73,7 @@ class AppConfig:
             "threshold_cpu": self.threshold_cpu,
             "threshold_mem": self.threshold_mem,
             "alert_lookahead_min": self.alert_lookahead_min,
-            "available_alert_channels": self.alerts.channels(),
+            "available_alert_channels": list(self.alerts.channels),
             "resource_ids": self.resource_ids,
         }
 
@@ -71,14 +84,20 @@ def _comma_split(value: Optional[str]) -> List[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+@lru_cache(maxsize=1)
 def load_config() -> AppConfig:
-    """Load configuration while applying sane defaults."""
+    """Load configuration while applying sane defaults.
+
+    The environment is read once per process; call ``load_config.cache_clear()``
+    after changing it.
+    """
     metrics_provider = os.getenv("METRICS_PROVIDER", "local").lower()
     poll_interval = int(os.getenv("POLL_INTERVAL_MINUTES", "5"))
     threshold_cpu = float(os.getenv("THRESHOLD_CPU", "90"))
     threshold_mem = float(os.getenv("THRESHOLD_MEM", "90"))
     alert_lookahead = int(os.getenv("ALERT_LOOKAHEAD_MIN", "60"))
     max_forecast_horizon = int(os.getenv("MAX_FORECAST_HORIZON_MIN", "180"))
+    embedded_scheduler = os.getenv("AUTOSCALE_EMBEDDED_SCHEDULER", "0") == "1"
 
     alerts = AlertSettings(
         slack_webhook_url=os.getenv("SLACK_WEBHOOK_URL"),
@@ -97,6 +116,7 @@ def load_config() -> AppConfig:
         threshold_mem=threshold_mem,
         alert_lookahead_min=alert_lookahead,
         max_forecast_horizon_min=max_forecast_horizon,
+        embedded_scheduler=embedded_scheduler,
         alerts=alerts,
     )
 
@@ -0,0 +1,142 @@
+"""SQLite engine and session setup shared by the web app and the scheduler process."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from api.models import Base
+from api.services.config import AppConfig
+
+LOGGER = logging.getLogger("autoscale.database")
+
+# Applied to every new connection, after WAL is enabled (see _enable_wal). WAL
+# lets dashboard reads proceed while the scheduler is writing; the rest trade
+# durability on power loss for fewer fsyncs and keep more of the database in memory.
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+)
+
+# Seconds to keep retrying the switch to WAL while other processes hold the database.
+WAL_SWITCH_TIMEOUT = 30.0
+
+# Indexes older databases still carry but the models no longer define. The
+# composite and unique indexes that replaced them lead with the same columns, so
+# they only add write cost.
+OBSOLETE_INDEXES = (
+    "ix_metrics_resource_id",
+    "ix_forecasts_resource_id",
+    "ix_alerts_resource_id",
+    "ix_forecast_resource_metric",
+)
+
+
+def create_session_factory(config: AppConfig) -> scoped_session:
+    """Create the engine, ensure the schema exists, and return a thread-local session registry."""
+    engine = create_engine(
+        f"sqlite:///{config.database_path}",
+        # Wait on a locked database instead of failing immediately while the scheduler writes.
+        connect_args={"check_same_thread": False, "timeout": 30},
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=-1,
+        pool_recycle=3600,
+        future=True,
+    )
+
+    @event.listens_for(engine, "connect")
+    def configure_sqlite(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        _enable_wal(cursor)
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    _ensure_schema(engine)
+
+    return scoped_session(sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+
+
+def _enable_wal(cursor: Any) -> None:
+    """Switch the database to WAL, retrying while concurrent starters hold it.
+
+    WAL is persistent, so this is a read-only check after the first switch. The
+    switch itself needs exclusive access and SQLite reports "database is locked"
+    without waiting on the busy timeout, which happens when several processes
+    open a fresh database at once.
+    """
+    if cursor.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+        return
+    deadline = time.monotonic() + WAL_SWITCH_TIMEOUT
+    while True:
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            return
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc) or time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _dedupe_forecasts(connection: Connection) -> None:
+    """Keep only the newest forecast per (resource_id, metric) before the unique index exists.
+
+    Databases written by the old delete-then-insert code, with several schedulers
+    running, can hold duplicate pairs that would make creating the index fail.
+    """
+    has_unique_index = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_forecast_resource_metric'"
+    ).first()
+    if has_unique_index:
+        return
+    deleted = connection.exec_driver_sql(
+        """
+        DELETE FROM forecasts WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY resource_id, metric ORDER BY created_at DESC, id DESC
+                ) AS rn
+                FROM forecasts
+            )
+            WHERE rn = 1
+        )
+        """
+    ).rowcount
+    if deleted:
+        LOGGER.info("Removed %d duplicate forecast rows before adding the unique index.", deleted)
+
+
+def _ensure_schema(engine: Engine) -> None:
+    """Create missing tables and indexes and drop obsolete ones, serialized across processes.
+
+    Every gunicorn worker and the scheduler process run this at startup. The
+    check-then-create steps happen inside one ``BEGIN IMMEDIATE`` transaction,
+    which takes SQLite's write lock up front, so concurrent starters wait for
+    each other (up to the connect timeout) and then see the finished schema.
+    """
+    # AUTOCOMMIT stops pysqlite from issuing its own BEGIN, so the explicit one below applies.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            Base.metadata.create_all(connection)
+            _dedupe_forecasts(connection)
+            # create_all() skips existing tables, so add indexes introduced since they were created.
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=connection, checkfirst=True)
+            for name in OBSOLETE_INDEXES:
+                connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
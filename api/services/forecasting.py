@@ -1,110 +1,175 @@
-"""Lightweight forecasting service built atop scikit-learn."""
+"""Lightweight linear-trend forecasting service built on NumPy."""
 
 from __future__ import annotations
 
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-from sklearn.linear_model import LinearRegression
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from api.models import ForecastRecord, MetricRecord
 from api.services.config import AppConfig
 
 LOGGER = logging.getLogger("autoscale.forecasting")
+# (metric column, AppConfig threshold attribute); the column order fixes the value matrix layout.
+METRIC_COLS = (
+    (MetricRecord.cpu_pct, "threshold_cpu"),
+    (MetricRecord.mem_pct, "threshold_mem"),
+)
+FORECAST_METRICS = tuple(column.key for column, _ in METRIC_COLS)
+HISTORY_LIMIT = 200
+FETCH_CHUNK_ROWS = 50
 
+Prediction = Tuple[Optional[datetime], Optional[float]]
 
-def update_forecasts(session: Session, config: AppConfig) -> List[ForecastRecord]:
+
+class ForecastCache:
+    """Bounded LRU of fitted predictions keyed by a resource's history window.
+
+    A key of (resource_id, newest timestamp, sample count) only repeats when no new
+    samples arrived since the last fit, so the stored predictions are still valid.
+    Not thread-safe; the scheduler runs one cycle at a time.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, datetime, int], Tuple[Prediction, ...]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, datetime, int]) -> Optional[Tuple[Prediction, ...]]:
+        predictions = self._entries.get(key)
+        if predictions is not None:
+            self._entries.move_to_end(key)
+        return predictions
+
+    def put(self, key: Tuple[str, datetime, int], predictions: Tuple[Prediction, ...]) -> None:
+        self._entries[key] = predictions
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+def update_forecasts(
+    session: Session,
+    config: AppConfig,
+    cache: Optional[ForecastCache] = None,
+    now: Optional[datetime] = None,
+) -> List[ForecastRecord]:
     """Train/update forecasts for each resource and metric.
 
-    Returns the list of forecast records that were persisted in this run.
+    When ``cache`` is given, resources whose history is unchanged since a previous
+    call reuse that fit. ``now`` (default: current UTC time) stamps ``created_at``.
+    Returns the forecasts written in this run as transient (session-detached) records.
     """
-    forecasts: List[ForecastRecord] = []
-    horizon = timedelta(minutes=config.max_forecast_horizon_min)
+    rows_to_upsert: List[Dict] = []
+    created_at = now or datetime.utcnow()
+    horizon = config.forecast_horizon
+
+    thresholds = np.array([getattr(config, attr) for _, attr in METRIC_COLS], dtype=np.float64)
+    # Reused for every resource; each query only fills the tail it needs.
+    timestamp_buf = np.empty(HISTORY_LIMIT, dtype="datetime64[us]")
+    value_buf = np.empty((HISTORY_LIMIT, len(FORECAST_METRICS)), dtype=np.float64)
+
+    # Plain row tuples of just the columns the fit needs, streamed in small chunks.
+    # Row layout is (timestamp, *metric values) in METRIC_COLS order.
+    history = (
+        select(MetricRecord.timestamp, *(column for column, _ in METRIC_COLS))
+        .where(MetricRecord.resource_id == bindparam("resource_id"))
+        .order_by(MetricRecord.timestamp.desc())
+        .limit(HISTORY_LIMIT)
+        .execution_options(stream_results=True, yield_per=FETCH_CHUNK_ROWS)
+    )
 
     for resource_id in config.resource_ids:
-        metrics = (
-            session.query(MetricRecord)
-            .filter(MetricRecord.resource_id == resource_id)
-            .order_by(MetricRecord.timestamp.desc())
-            .limit(200)
-            .all()
-        )
-        metrics = list(reversed(metrics))
-        if len(metrics) < 5:
+        first = HISTORY_LIMIT
+        for chunk in session.execute(history, {"resource_id": resource_id}).partitions():
+            # Rows arrive newest first, so fill the buffers back to front to keep time order.
+            chunk.reverse()
+            timestamp_buf[first - len(chunk) : first] = [row[0] for row in chunk]
+            # None becomes NaN and marks a missing sample.
+            value_buf[first - len(chunk) : first] = [row[1:] for row in chunk]
+            first -= len(chunk)
+
+        if HISTORY_LIMIT - first < 5:
             LOGGER.debug("Skipping forecast for %s - insufficient data points.", resource_id)
             continue
 
-        for metric_name, threshold in (("cpu_pct", config.threshold_cpu), ("mem_pct", config.threshold_mem)):
-            predicted_dt, confidence = _predict_threshold_crossing(metrics, metric_name, threshold, horizon)
-
-            # Remove older forecasts for this resource/metric pair.
-            session.query(ForecastRecord).filter(
-                ForecastRecord.resource_id == resource_id, ForecastRecord.metric == metric_name
-            ).delete()
-
-            record = ForecastRecord(
-                resource_id=resource_id,
-                metric=metric_name,
-                predicted_breach_time=predicted_dt,
-                confidence=confidence,
+        timestamps = timestamp_buf[first:]
+        cache_key = (resource_id, timestamps[-1].item(), len(timestamps))
+        predictions = cache.get(cache_key) if cache is not None else None
+        if predictions is None:
+            values = value_buf[first:]
+            start_ts = timestamps[0].item()
+            minutes = (timestamps - timestamps[0]) / np.timedelta64(1, "m")
+            predictions = tuple(_predict_threshold_crossings(start_ts, minutes, values, thresholds, horizon))
+            if cache is not None:
+                cache.put(cache_key, predictions)
+
+        for metric_name, (predicted_dt, confidence) in zip(FORECAST_METRICS, predictions):
+            rows_to_upsert.append(
+                {
+                    "resource_id": resource_id,
+                    "metric": metric_name,
+                    "predicted_breach_time": predicted_dt,
+                    "confidence": confidence,
+                    "created_at": created_at,
+                }
             )
-            session.add(record)
-            forecasts.append(record)
-
-    return forecasts
-
 
-def _predict_threshold_crossing(
-    metrics: Sequence[MetricRecord],
-    metric_attr: str,
-    threshold: float,
-    horizon: timedelta,
-) -> Tuple[Optional[datetime], Optional[float]]:
-    """Use linear regression to estimate when a metric will cross a threshold."""
-    times: List[float] = []
-    values: List[float] = []
-
-    start_ts = metrics[0].timestamp
-    for record in metrics:
-        value = getattr(record, metric_attr)
-        if value is None:
-            continue
-        delta_minutes = (record.timestamp - start_ts).total_seconds() / 60.0
-        times.append(delta_minutes)
-        values.append(value)
-
-    if len(values) < 5:
-        return None, None
-
-    X = np.array(times).reshape(-1, 1)
-    y = np.array(values)
+    if rows_to_upsert:
+        # Replace each (resource_id, metric) forecast in place with one executemany.
+        stmt = sqlite_insert(ForecastRecord)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["resource_id", "metric"],
+            set_={
+                "predicted_breach_time": stmt.excluded.predicted_breach_time,
+                "confidence": stmt.excluded.confidence,
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        session.execute(stmt, rows_to_upsert)
 
-    model = LinearRegression()
-    model.fit(X, y)
+    return [ForecastRecord(**row) for row in rows_to_upsert]
 
-    slope = float(model.coef_[0])
-    last_value = values[-1]
-    last_time_minutes = times[-1]
 
-    if slope <= 0.0:
-        return None, None
+def _predict_threshold_crossings(
+    start_ts: datetime,
+    minutes: np.ndarray,
+    values: np.ndarray,
+    thresholds: np.ndarray,
+    horizon: timedelta,
+) -> List[Prediction]:
+    """Fit a least-squares line to each column of ``values`` and estimate threshold crossings.
 
-    minutes_to_threshold = (threshold - last_value) / slope
-    if minutes_to_threshold <= 0:
-        predicted_dt = start_ts + timedelta(minutes=last_time_minutes)
-    else:
-        predicted_dt = start_ts + timedelta(minutes=last_time_minutes + minutes_to_threshold)
+    ``minutes`` holds each row's offset from ``start_ts``; NaN values are missing samples
+    and are excluded from their column's fit only. Returns one (time, confidence) per column.
+    """
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+    x = np.broadcast_to(minutes[:, None], values.shape)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dx = np.where(present, x - (np.where(present, x, 0.0).sum(axis=0) / counts), 0.0)
+        dy = np.where(present, values - (np.where(present, values, 0.0).sum(axis=0) / counts), 0.0)
+        slopes = (dx * dy).sum(axis=0) / (dx * dx).sum(axis=0)
+        residuals = dy - slopes * dx
+        confidences = 1.0 - (residuals * residuals).sum(axis=0) / (dy * dy).sum(axis=0)
+
+        # Extrapolate from each column's most recent present sample.
+        last_rows = len(minutes) - 1 - np.argmax(present[::-1], axis=0)
+        last_minutes = minutes[last_rows]
+        last_values = values[last_rows, np.arange(values.shape[1])]
+        predicted_minutes = last_minutes + np.maximum((thresholds - last_values) / slopes, 0.0)
 
     # Ensure prediction lies within the configurable horizon.
-    if predicted_dt - metrics[-1].timestamp > horizon:
-        return None, None
-
-    try:
-        confidence = float(model.score(X, y))
-    except Exception:
-        confidence = None
+    horizon_minutes = horizon / timedelta(minutes=1)
+    valid = (counts >= 5) & (slopes > 0.0) & (predicted_minutes - minutes[-1] <= horizon_minutes)
 
-    return predicted_dt, confidence
+    return [
+        (start_ts + timedelta(minutes=float(offset)), float(confidence)) if ok else (None, None)
+        for ok, offset, confidence in zip(valid, predicted_minutes, confidences)
+    ]
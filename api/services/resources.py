@@ -0,0 +1,42 @@
+"""Tracks which resources have stored metrics without scanning the metrics table per request."""
+
+from __future__ import annotations
+
+import time
+from typing import FrozenSet, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from api.models import MetricRecord
+
+
+class KnownResources:
+    """Resource ids that have at least one stored metric sample.
+
+    An embedded scheduler calls :meth:`update` after every ingest. When the
+    scheduler runs in its own process nothing can push updates here, so
+    ``max_age`` makes the set re-read the ids from the database periodically.
+    """
+
+    def __init__(self, session_factory, max_age: Optional[float] = None):
+        self._session_factory = session_factory
+        self._max_age = max_age
+        self._ids: FrozenSet[str] = frozenset()
+        self._loaded_at = 0.0
+        self.reload()
+
+    def reload(self) -> None:
+        session = self._session_factory()
+        self._ids = frozenset(session.scalars(select(MetricRecord.resource_id).distinct()))
+        self._loaded_at = time.monotonic()
+
+    def update(self, resource_ids: Iterable[str]) -> None:
+        # Publish a new frozenset rather than mutating, so readers never see a partial update.
+        new_ids = frozenset(resource_ids) - self._ids
+        if new_ids:
+            self._ids = self._ids | new_ids
+
+    def sorted(self) -> List[str]:
+        if self._max_age is not None and time.monotonic() - self._loaded_at > self._max_age:
+            self.reload()
+        return sorted(self._ids)
@@ -3,37 +3,53 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from api.collectors.aws_cloudwatch import AWSCloudWatchCollector
-from api.collectors.base import MetricCollector, MetricSample, CollectorError
+from api.collectors.base import MetricBatch, MetricCollector, CollectorError
 from api.collectors.gcp_monitoring import GCPMonitoringCollector
 from api.collectors.local_psutil import LocalPsutilCollector
-from api.models import MetricRecord
+from api.models import ForecastRecord, MetricRecord
 from api.services import forecasting, alerts
+from api.services.cache import bump_version
 from api.services.config import AppConfig
+from api.services.resources import KnownResources
 
 LOGGER = logging.getLogger("autoscale.scheduler")
+INSERT_CHUNK_ROWS = 1000
 
 
 class SchedulerService:
     """Coordinates periodic metric collection, forecasting, and alerting."""
 
-    def __init__(self, session_factory, config: AppConfig):
+    def __init__(
+        self,
+        session_factory,
+        config: AppConfig,
+        known_resources: Optional[KnownResources] = None,
+    ):
         self._session_factory = session_factory
         self._config = config
+        self._known_resources = known_resources
         self._scheduler = BackgroundScheduler()
+        # Alert delivery can block on Slack/SMTP timeouts, so it runs off the collection
+        # thread. A single worker keeps dispatches ordered, so each one sees the alerts
+        # recorded by the previous one and does not resend them.
+        self._alert_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autoscale-alert-dispatch")
         try:
             self._collector = self._build_collector(config)
         except CollectorError as exc:
             LOGGER.warning("Collector initialization failed (%s); falling back to local provider.", exc)
             self._collector = LocalPsutilCollector(resource_ids=config.resource_ids)
         self._job_id = "collect_metrics"
+        self._forecast_cache = forecasting.ForecastCache()
+        self._has_alert_channels = bool(config.alerts.channels)
 
     def start(self) -> None:
         if self._scheduler.running:
@@ -56,22 +72,28 @@ class SchedulerService:
             return
         LOGGER.info("Shutting down scheduler.")
         self._scheduler.shutdown(wait=False)
+        self._alert_executor.shutdown(wait=False)
 
     def _run_cycle(self) -> None:
         LOGGER.debug("Running scheduler cycle for provider %s", self._config.metrics_provider)
         session: Session = self._session_factory()
         try:
-            samples = self._collector.fetch()
-            if samples:
-                self._persist_samples(session, samples)
-            forecasts = forecasting.update_forecasts(session, self._config)
-            if forecasts:
-                alerts.dispatch_alerts(session, forecasts, self._config)
-            try:
-                session.commit()
-            except IntegrityError:
-                session.rollback()
-                LOGGER.warning("Duplicate metric insertion detected; continuing.")
+            batch = self._collector.fetch()
+            # One timestamp for the rest of the cycle: forecast creation and the alert
+            # window use it. Taken after the fetch so it is never older than the samples.
+            now = datetime.utcnow()
+            if len(batch):
+                self._persist_batch(session, batch)
+            forecasts = forecasting.update_forecasts(session, self._config, self._forecast_cache, now)
+            session.commit()
+            if len(batch) and self._known_resources is not None:
+                self._known_resources.update(batch.resource_ids)
+            # Clears only this process's response cache: effective with the embedded
+            # scheduler; under run_scheduler the web workers rely on the cache TTL.
+            bump_version()
+            # Nothing to deliver without a channel or a predicted breach.
+            if self._has_alert_channels and any(f.predicted_breach_time for f in forecasts):
+                self._alert_executor.submit(self._dispatch_alerts, forecasts, now)
         except CollectorError as exc:
             session.rollback()
             LOGGER.error("Collector error: %s", exc)
@@ -81,20 +103,28 @@ class SchedulerService:
         finally:
             session.close()
 
-    def _persist_samples(self, session: Session, samples: List[MetricSample]) -> None:
-        for sample in samples:
-            session.add(
-                MetricRecord(
-                    provider=sample.provider,
-                    resource_id=sample.resource_id,
-                    timestamp=sample.timestamp,
-                    cpu_pct=sample.cpu_pct,
-                    mem_pct=sample.mem_pct,
-                    net_in_kbps=sample.net_in_kbps,
-                    net_out_kbps=sample.net_out_kbps,
-                )
-            )
-        LOGGER.debug("Persisted %d metric samples.", len(samples))
+    def _dispatch_alerts(self, forecasts: List[ForecastRecord], now: datetime) -> None:
+        # Runs on the alert worker thread, which gets its own scoped session.
+        session: Session = self._session_factory()
+        try:
+            alerts.dispatch_alerts(session, forecasts, self._config, now)
+            session.commit()
+            bump_version()
+        except Exception:
+            session.rollback()
+            LOGGER.exception("Unhandled error during alert dispatch")
+        finally:
+            self._session_factory.remove()
+
+    def _persist_batch(self, session: Session, batch: MetricBatch) -> None:
+        # Core executemany INSERTs in fixed-size chunks. Providers can report the same
+        # latest datapoint on consecutive polls; those rows are skipped rather than
+        # failing the cycle on the (resource_id, timestamp) unique constraint.
+        stmt = sqlite_insert(MetricRecord).on_conflict_do_nothing(index_elements=["resource_id", "timestamp"])
+        rows = batch.rows()
+        for offset in range(0, len(rows), INSERT_CHUNK_ROWS):
+            session.execute(stmt, rows[offset : offset + INSERT_CHUNK_ROWS])
+        LOGGER.debug("Persisted %d metric samples.", len(batch))
 
     def _build_collector(self, config: AppConfig) -> MetricCollector:
         if config.metrics_provider == "aws":
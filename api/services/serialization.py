@@ -0,0 +1,30 @@
+"""orjson-backed JSON provider for Flask responses."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+# Stored datetimes are naive UTC; emit them with a trailing "Z" so browsers
+# parse them as UTC rather than local time.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+class ORJSONProvider(JSONProvider):
+    """Serializes responses with orjson, which encodes datetimes natively."""
+
+    option = ORJSON_OPTIONS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=self.option).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Skip the bytes -> str -> bytes round trip of the base implementation.
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype="application/json")